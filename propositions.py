@@ -11,7 +11,12 @@ its type:
 """
 
 import re
-import itertools
+import functools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 fixed_chars = {
     "~": "¬",
@@ -23,77 +28,102 @@ fixed_chars = {
     "(": "(",
     ")": ")",
 }
+fixed_chars_table = str.maketrans(fixed_chars)
+
+whitespace_pattern = re.compile(r"\s")
+letter_pattern = re.compile(r"[a-z]")
+token_pattern = re.compile(r"\d+")
+
+# rapid validation tests, checked in order:
+validation_rules = [
+    # digits
+    (re.compile(r"\d"), "Input cannot contain digits (ex. {})!"),
+    # all unallowed characters
+    (
+        re.compile(r"[^a-z()~&|+<>]"),
+        "Input cannot contain unallowed characters (ex. {})!",
+    ),
+    # adjacent letters
+    (
+        re.compile(r"[a-z]{2,}"),
+        "Every simple proposition can only be represented by"
+        + " a single letter! (ex. {})!",
+    ),
+    # a group can only begin with: ( ~ or a-z
+    (
+        re.compile(r"\([^(~a-z]"),
+        "A group can only begin with: ( ~ or letter! (ex. {})!",
+    ),
+    # a group can only end with: ) or a-z
+    (
+        re.compile(r"[^a-z)]\)"),
+        "A group can only end with: ) or letter! (ex. {})!",
+    ),
+    # ~ between propositions or at the end
+    (
+        re.compile(r"[a-z)]~"),
+        "~ operator cannot appear between two propositions"
+        + " or at the end! (ex. {})!",
+    ),
+    # binary operators must have exactly 2 terms
+    (
+        re.compile(r"[^)a-z][&|+<>]|[&|+<>][^a-z(~]|^[&|+<>]|[&|+<>~]$"),
+        "Binary operators can only have 2 operands! (ex. {})!",
+    ),
+    # parentheses adjacent to letters: a( or )a
+    (
+        re.compile(r"[a-z][(]|[)][a-z]"),
+        "Parentheses cannot be adjacent to letters: a( or )a! (ex. {})!",
+    ),
+]
+
+# binding powers follow Python's precedence for the overloaded operators;
+# implication and equivalence group to the right
+binding_powers = {"<": 1, ">": 1, "|": 2, "&": 3, "+": 4}
+right_associative = {"<", ">"}
+
+# bitwise equivalents of the operators, ALL being the mask of a tautology:
+# (template, precedence needed by the left and right operands, precedence of
+# the result), using Python's precedence: | 1, ^ 2, & 3, operand 4
+bitwise_operators = {
+    "&": ("{} & {}", 3, 3, 3),
+    "|": ("{} | {}", 1, 1, 1),
+    "+": ("{} ^ {}", 2, 2, 2),
+    ">": ("ALL ^ {} | {}", 2, 1, 1),
+    "<": ("ALL ^ {} ^ {}", 2, 2, 2),
+}
 
 
 class Proposition:
     """
-    The representation of a proposition and of its supported operators.
+    The record of a simple proposition: its name and its mask.
+    The mask holds the truth value of every interpretation: bit i is set if
+    the proposition is true on row i of the truth table.
     """
 
-    def __init__(self, value=bool(), name=str()):
-        self.value = True if value is not False else False
-        self.name = name
+    __slots__ = ("mask", "name")
 
-    def __invert__(self):
-        """
-        Negation operator.
-        """
-        value = True if self.value is False else False
-        return Proposition(value)
-
-    def __and__(self, other):
-        """
-        Conjunction operator.
-        """
-        value = True if self.value and other.value else False
-        return Proposition(value)
-
-    def __or__(self, other):
-        """
-        Disjunction operator.
-        """
-        value = True if self.value or other.value else False
-        return Proposition(value)
-
-    def __add__(self, other):
-        """
-        Exclusive disjunction operator.
-        """
-        value = False if self.value == other.value else True
-        return Proposition(value)
-
-    def __gt__(self, other):
-        """
-        Implication operator.
-        """
-        value = False if (self.value is True) and (
-            other.value is False) else True
-        return Proposition(value)
-
-    def __lt__(self, other):
-        """
-        Equivalence operator.
-        """
-        value = True if self.value == other.value else False
-        return Proposition(value)
+    def __init__(self, mask=int(), name=str()):
+        self.mask = mask
+        self.name = name
 
 
 def extract_simple_propositions(input_string):
     """
-    Adds Proposition objects from each distinct letter to the global scope
-    and into a sorted global list.
+    Creates a sorted global list of Proposition objects from each distinct
+    letter. Each one gets the mask of its column in the truth table;
+    all_ones is the mask of a tautology.
     """
-    global simple_propositions
-    simple_propositions = []
+    global simple_propositions, all_ones
 
-    letters = set(re.findall(r"([a-z])", input_string))
-    letters = sorted(list(letters))
+    letters = sorted(set(letter_pattern.findall(input_string)))
+    n = len(letters)
+    all_ones = (1 << (1 << n)) - 1
 
-    for e in letters:
-        if eval(f"'{e}' not in [prop.name for prop in simple_propositions]"):
-            exec(f"global {e}; \
-                {e} = Proposition(name = '{e}'); \
-                simple_propositions.append({e})")
+    simple_propositions = [
+        Proposition(all_ones // ((1 << (1 << (n - k - 1))) + 1), name=e)
+        for k, e in enumerate(letters)
+    ]
 
 
 def extract_tokens(input_string):
@@ -101,19 +131,35 @@ def extract_tokens(input_string):
     Returns a dictionary of tokens which represent the groups from parantheses
     and their positions in the string.
     Tokens are of type (position: group); subgroups are represented by key.
+    The string is scanned once: a group is stored when its parenthesis closes,
+    so subgroups always get smaller keys than the groups containing them.
+    Returns None if the string contains unmatched parentheses.
     """
     tokens = dict()
     counter = 0
-
-    while True:
-        groups = re.findall(r"(~?\([^()]*?\))", input_string)
-        if groups:
-            for i in range(len(groups)):
-                tokens[counter] = groups[i]
-                input_string = input_string.replace(groups[i], f"{counter}")
-                counter += 1
-        else:
-            break
+    # every open group holds its parts and the index of its next slice
+    stack = [[[], 0]]
+
+    for i, char in enumerate(input_string):
+        if char == "(":
+            start = i - 1 if i and input_string[i - 1] == "~" else i
+            stack[-1][0].append(input_string[stack[-1][1]:start])
+            stack[-1][1] = start
+            stack.append([[], start])
+        elif char == ")":
+            if len(stack) == 1:
+                return None
+            parts, start = stack.pop()
+            parts.append(input_string[start:i + 1])
+            tokens[counter] = "".join(parts)
+            stack[-1][0].append(f"{counter}")
+            stack[-1][1] = i + 1
+            counter += 1
+
+    if len(stack) > 1:
+        return None
+    parts, start = stack[0]
+    input_string = "".join(parts) + input_string[start:]
 
     return [input_string, tokens]
 
@@ -124,18 +170,126 @@ def decompress_tokens(input_string, tokens):
     extract_tokens().
     """
     while True:
-        match = re.search(r"(\d+?)", input_string)
-        if not match:
-            return input_string
+        output = token_pattern.sub(
+            lambda match: tokens[1][int(match.group())], input_string
+        )
+        if output == input_string:
+            return output
+        input_string = output
+
+
+def translate_proposition(input_string):
+    """
+    Translates a proposition into a Python expression over integer masks,
+    using a Pratt parser. Operators of equal precedence group to the left,
+    except implication and equivalence, which group to the right. Parentheses
+    are only added where Python's precedence needs them, so long chains stay
+    flat.
+    """
+    position = 0
+
+    def wrap(expression, precedence):
+        source, own_precedence = expression
+        return source if own_precedence >= precedence else f"({source})"
+
+    def combine(operator, left, right):
+        template, left_precedence, right_precedence, precedence = (
+            bitwise_operators[operator])
+        source = template.format(
+            wrap(left, left_precedence), wrap(right, right_precedence))
+        return (source, precedence)
+
+    def parse_operand():
+        nonlocal position
+        negations = 0
+        while input_string[position] == "~":
+            negations += 1
+            position += 1
+
+        char = input_string[position]
+        position += 1
+        if char == "(":
+            operand = parse(0)
+            position += 1  # closing parenthesis
         else:
-            i = match.group(1)
-            input_string = input_string.replace(i, tokens[1][int(i)])
+            operand = (char, 4)
+
+        # an even number of negations is the identity
+        if negations % 2:
+            operand = (f"ALL ^ {wrap(operand, 2)}", 2)
+
+        return operand
+
+    def parse(min_power):
+        nonlocal position
+        left = parse_operand()
+
+        while position < len(input_string):
+            operator = input_string[position]
+            power = binding_powers.get(operator, 0)
+            if power <= min_power:
+                break
+            position += 1
+            if operator in right_associative:
+                # the whole chain is collected, then folded from the right
+                chain = [(operator, left)]
+                right = parse(power)
+                while (position < len(input_string)
+                       and input_string[position] in right_associative):
+                    chain.append((input_string[position], right))
+                    position += 1
+                    right = parse(power)
+                for operator, operand in reversed(chain):
+                    right = combine(operator, operand, right)
+                left = right
+            else:
+                left = combine(operator, left, parse(power))
+
+        return left
+
+    return parse(0)[0]
+
+
+@functools.lru_cache(maxsize=512)
+def compile_columns(names, columns):
+    """
+    Generates a function which returns the masks of the given columns from
+    the masks of the simple propositions and the mask of a tautology; it is
+    reused for every following input with the same columns.
+    """
+    parameters = ", ".join(names + ("ALL",))
+    masks = ", ".join(translate_proposition(column) for column in columns)
+
+    return eval(f"lambda {parameters}: [{masks}]", {"__builtins__": {}})
+
+
+def unpack_masks(masks, rows):
+    """
+    Returns the rows of booleans described by the given column masks,
+    vectorized with NumPy when it is available.
+    """
+    size = max(1, rows // 8)
+    columns = [mask.to_bytes(size, "little") for mask in masks]
+
+    if numpy is None:
+        result = []
+        for i in range(rows):
+            byte, bit = i >> 3, 1 << (i & 7)
+            result.append([bool(column[byte] & bit) for column in columns])
+        return result
+
+    matrix = numpy.frombuffer(b"".join(columns), dtype=numpy.uint8)
+    bits = numpy.unpackbits(
+        matrix.reshape(len(columns), size), axis=1, bitorder="little")
+
+    return bits[:, :rows].T.astype(bool).tolist()
 
 
 def get_table():
     """
     Generates a list with the elements of the truth table, using
-    simple_propositions and tokens.
+    simple_propositions and tokens; returns it with the mask of the whole
+    proposition.
     """
     table_header = (
         [prop.name for prop in simple_propositions]
@@ -144,146 +298,101 @@ def get_table():
     )
     table = [table_header]
 
-    truth_combinations = list(
-        itertools.product([True, False], repeat=len(simple_propositions))
-    )
+    n = len(simple_propositions)
+    masks = [prop.mask for prop in simple_propositions]
+    columns = compile_columns(tuple(table_header[:n]), tuple(table_header[n:]))
+    # every complex column is evaluated once, for all rows at the same time
+    column_masks = masks + columns(*masks, all_ones)
 
-    for row_index in range(len(truth_combinations)):
-        table.append(list(truth_combinations[row_index]))
-        for i in range(len(simple_propositions)):
-            simple_propositions[i].value = truth_combinations[row_index][i]
-        for i in range(len(simple_propositions), len(table_header)):
-            code = table_header[i]
-            table[row_index + 1].append(eval(f"({code}).value"))
+    table += unpack_masks(column_masks, 1 << n)
 
-    return table
+    return [table, column_masks[-1]]
 
 
 def display_table(table):
     """
     Displays the truth table, using the appropriate symbols and formatting.
     """
-    result = "\n\t"
-    empty = ""
+    parts = ["\n\t"]
     column_width = []
 
-    table.insert(1, ["" for i in table[0]])
-    for i in range(len(table)):
-        for j in range(len(table[i])):
-            # separator
-            separator = "\n\t" if j == (len(table[i]) - 1) else "|"
-            if i == 0:  # header
-                header = replace_operators(table[0][j])
-                element = f"{header:^{len(header)+2}}"
-                result += element + separator
-                column_width.append(len(element))
-            elif i == 1:  # separation line
-                result += f"{empty:-^{column_width[j]}}" + (
-                    "\n\t" if j == (len(table[i]) - 1) else "+"
-                )
-            else:  # table content
-                value = "T" if table[i][j] is True else "F"
-                result += f"{value:^{column_width[j]}}" + separator
+    # header
+    for j, header in enumerate(table[0]):
+        header = replace_operators(header)
+        column_width.append(len(header) + 2)
+        parts += [f"{header:^{column_width[j]}}", "|"]
+    parts[-1] = "\n\t"
 
-    return result
+    # separation line
+    for width in column_width:
+        parts += ["-" * width, "+"]
+    parts[-1] = "\n\t"
+
+    # table content
+    for i in range(1, len(table)):
+        for j, value in enumerate(table[i]):
+            parts += [f"{'T' if value else 'F':^{column_width[j]}}", "|"]
+        parts[-1] = "\n\t"
 
+    return "".join(parts)
 
+
+@functools.lru_cache(maxsize=1024)
 def replace_operators(input_string):
     """
     Replaces the input operators with the ones for proper display.
     """
-    for key in fixed_chars.keys():
-        input_string = input_string.replace(key, fixed_chars[key])
-
-    return input_string
+    return input_string.translate(fixed_chars_table)
 
 
-def get_proposition_type(table):
+def get_proposition_type(mask):
     """
-    Determines the proposition type.
+    Determines the proposition type from its mask.
     """
-    last_column = []
-    j = len(table[1]) - 1
-    for i in range(1, len(table)):
-        last_column += [table[i][j]]
-
     result = ""
-    if False not in last_column:
+    if mask == all_ones:
         result = "valid (tautology, also satisfiable)"
-    elif True not in last_column:
+    elif mask == 0:
         result = "contradiction (unsatisfiable)"
-    elif True in last_column:
-        result = "satisfiable"  # never displayed... :)
-        if False in last_column:
-            result = "contingent (also satisfiable)"
+    else:
+        result = "contingent (also satisfiable)"
 
     return result
 
 
 def parse_propositions(input_string):
     """
-    Validates the input, creates global variables for each simple proposition,
+    Validates the input, creates the list of simple propositions,
     returns an object with the tokens.
     """
     global initial_string
 
-    input_string = re.sub(r"\s", "", input_string.lower())
+    input_string = whitespace_pattern.sub("", input_string.lower())
     if input_string == "":
         print("Input cannot be empty.")
         return False
 
     initial_string = input_string
 
-    # rapid validation tests:
-    patterns = r"""
-        (?:(\d)|                # 1 digits
-        ([^a-z()~&|+<>])|       # 2 all unallowed characters
-        ([a-z]{2,})|            # 3 adjacent letters
-        (\([^(~a-z])|           # 4 a group can only begin with: ( ~ or a-z
-        ([^a-z)]\))|            # 5 a group can only end with: ) or a-z
-        ([a-z)]~)|              # 6 ~ between propositions or at the end
-        ([^)a-z][&|+<>]|        # 7 binary operators must have exactly 2 terms
-            [&|+<>][^a-z(~]|
-            ^[&|+<>]|
-            [&|+<>~]$)|
-        ([a-z][(]|[)][a-z]))    # 8 parentheses adjacent to letters: a( or )a
-    """
-    regex = re.compile(patterns, re.X)
-    matcher = regex.search(input_string)
-    if matcher:
-        message = str()
-        if matcher.group(1):
-            message = f"Input cannot contain digits (ex. {matcher.group(1)})!"
-        elif matcher.group(2):
-            message = "Input cannot contain unallowed characters (ex." \
-                + f" {matcher.group(2)})!"
-        elif matcher.group(3):
-            message = "Every simple proposition can only be represented by" \
-                + f" a single letter! (ex. {matcher.group(3)})!"
-        elif matcher.group(4):
-            message = "A group can only begin with: ( ~ or letter!" \
-                + f" (ex. {matcher.group(4)})!"
-        elif matcher.group(5):
-            message = "A group can only end with: ) or letter!" \
-                + f" (ex. {matcher.group(5)})!"
-        elif matcher.group(6):
-            message = "~ operator cannot appear between two propositions" \
-                + f" or at the end! (ex. {matcher.group(6)})!"
-        elif matcher.group(7):
-            message = "Binary operators can only have 2 operands!" \
-                + f" (ex. {matcher.group(7)})!"
-        elif matcher.group(8):
-            message = "Parentheses cannot be adjacent to letters: a( or )a!" \
-                + f" (ex. {matcher.group(8)})!"
-        print(message)
-        return False
+    for pattern, message in validation_rules:
+        matcher = pattern.search(input_string)
+        if matcher:
+            print(message.format(matcher.group()))
+            return False
 
     tokens = extract_tokens(input_string)
-    if re.search(r"[()]", tokens[0]):
+    if tokens is None:
         print("Input cannot contain unmatched parentheses!")
         return False
     extract_simple_propositions(input_string)
 
+    try:
+        names = tuple(prop.name for prop in simple_propositions)
+        compile_columns(names, (input_string,))
+    except (SyntaxError, RecursionError):
+        print("Input is nested too deeply!")
+        return False
+
     return tokens
 
 
@@ -317,6 +426,6 @@ print(example)
 while True:
     print("\nType a complex proposition: ")
     tokens = validate_input(input())
-    table = get_table()
+    table, mask = get_table()
     print(display_table(table))
-    print(f"\nThe proposition is: {get_proposition_type(table)}.")
+    print(f"\nThe proposition is: {get_proposition_type(mask)}.")